@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+# The actual implementation lives in amigen.core. It is only imported as soon as something from it is used,
+# so `import amigen` (and `python -m amigen`) does not pull in nmigen up front.
+import importlib
+
+# keep in sync with amigen.core.__all__, duplicated here so the names are known without importing the core
+__all__ = [
+    'GlobalKey',
+    'Key',
+    'Element',
+    'ElaborationContext',
+    'GlobalElaborationContext',
+    'Signal',
+    'Value',
+    'Cat',
+    'ClockDomain',
+    'DomainMapper',
+    'ClockSignal',
+    'ResetSignal',
+    'element_to_module',
+    'element_to_module_async',
+    'elaboration_stats',
+    'write_elaboration_stats'
+]
+
+def __getattr__(name):
+    # dunder lookups (`__path__`, `__file__`, ...) must not trigger the import of the core
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    core = importlib.import_module(".core", __name__)
+    if name == "core":
+        return core
+
+    try:
+        return getattr(core, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
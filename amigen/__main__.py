@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+# Build a top-level Element from the command line
+#
+#     python -m amigen my_design.top:Top -o top.v
+#
+# loads `Top` from the module `my_design.top`, elaborates it, converts it to verilog (or rtlil, depending on the extension of the output file)
+# and writes the result. A timing breakdown of the individual phases is printed to stderr.
+#
+# The top-level Element is elaborated with `for_nmigen = True`, so its clock domains are exposed as regular nmigen domains
+# (`sync` becomes the `clk` / `rst` ports of the top module). The other ports of the top module are taken from the `ports()`
+# method of the top-level Element, if it has one, which has to return the signals to expose after elaboration. Without it every undriven
+# signal becomes a input and there are no outputs at all, so yosys will optimize away all the logic when converting to verilog.
+# A platform can be passed with `--platform module.path:Name`, either a Platform instance or a callable returning one.
+# Only the standard library is imported up front, nmigen, the amigen core and the backends are imported when the phase needing them runs.
+from __future__ import annotations
+from contextlib import contextmanager
+import argparse
+import importlib
+import os
+import sys
+import time
+
+# the output format for each supported file extension
+OUTPUT_FORMATS = {
+    ".v": "verilog",
+    ".il": "rtlil",
+    ".rtlil": "rtlil",
+}
+
+# the stats format for each supported file extension
+STATS_FORMATS = {
+    ".json": "json",
+    ".csv": "csv",
+}
+
+class PhaseTimer:
+    def __init__(self):
+        # list of (phase name, seconds), in the order the phases ran
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self, file = None):
+        if file is None:
+            file = sys.stderr
+
+        width = max(len(name) for name, _ in [*self.phases, ("total", 0)])
+        for name, seconds in self.phases:
+            print(f"{name:<{width}} {seconds * 1000:10.1f} ms", file = file)
+        print(f"{'total':<{width}} {sum(seconds for _, seconds in self.phases) * 1000:10.1f} ms", file = file)
+
+def load_object(spec: str):
+    module_name, _, attr = spec.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"expected `module.path:Name`, not {spec!r}")
+
+    obj = importlib.import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+def format_for(path: str, formats: dict[str, str], what: str) -> str:
+    extension = os.path.splitext(path)[1]
+    if extension not in formats:
+        raise ValueError(f"don't know which {what} format to use for {path}, supported extensions are {', '.join(formats)}")
+    return formats[extension]
+
+def main(argv = None) -> int:
+    parser = argparse.ArgumentParser(prog = "python -m amigen", description = "Elaborate a top-level amigen Element and convert it to verilog or rtlil.")
+    parser.add_argument("element", help = "the top-level Element as `module.path:Name`, either a Element instance or a callable returning one (like a Element subclass)")
+    parser.add_argument("-o", "--output", required = True, help = "output file, the format is chosen by the extension (.v for verilog, .il / .rtlil for rtlil)")
+    parser.add_argument("-n", "--name", default = "top", help = "name of the top-level module (default: %(default)s)")
+    parser.add_argument("-p", "--platform", help = "the platform to elaborate for as `module.path:Name`, either a Platform instance or a callable returning one")
+    parser.add_argument("--stats", help = "also write the elaboration statistics to this file (.json or .csv)")
+    args = parser.parse_args(argv)
+
+    try:
+        output_format = format_for(args.output, OUTPUT_FORMATS, "output")
+        stats_format = format_for(args.stats, STATS_FORMATS, "stats") if args.stats is not None else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    timer = PhaseTimer()
+
+    # report the phases that did run even if a later one fails (for example when yosys is missing)
+    try:
+        with timer.phase("import"):
+            from amigen.core import Element, element_to_module, elaboration_stats, write_elaboration_stats
+            from nmigen import Fragment
+            top = load_object(args.element)
+            platform = load_object(args.platform) if args.platform is not None else None
+
+        with timer.phase("construct"):
+            if not isinstance(top, Element):
+                top = top()
+            if not isinstance(top, Element):
+                raise TypeError(f"{args.element} did not produce a Element, but {top!r}")
+
+            if callable(platform):
+                platform = platform()
+
+        with timer.phase("elaborate"):
+            module = element_to_module(top, platform = platform, top_name = args.name, for_nmigen = True)
+            fragment = Fragment.get(module, platform)
+            ports = list(top.ports()) if hasattr(top, "ports") else None
+
+        if stats_format is not None:
+            with timer.phase("stats"):
+                with open(args.stats, "w") as f:
+                    write_elaboration_stats(elaboration_stats(module), f, format = stats_format)
+
+        with timer.phase("convert"):
+            if output_format == "verilog":
+                from nmigen.back.verilog import convert_fragment
+            else:
+                from nmigen.back.rtlil import convert_fragment
+            output, _ = convert_fragment(fragment.prepare(ports = ports), name = args.name)
+
+        with timer.phase("write"):
+            with open(args.output, "w") as f:
+                f.write(output)
+    finally:
+        timer.report()
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,13 +3,20 @@
 from __future__ import annotations
 from contextlib import contextmanager
 from nmigen import Module, Signal, Value, Cat, ClockDomain, Fragment, DomainRenamer
-from nmigen.build import Platform
+from nmigen.hdl.ast import Statement
 import warnings
 import nmigen
-from typing import Any, Iterable
+from typing import Any, Iterable, TextIO, TYPE_CHECKING
 from collections import defaultdict
+from collections.abc import Mapping
 import functools
+import sys
 
+# only used for annotations, importing nmigen.build pulls in jinja2 and the toolchain machinery
+if TYPE_CHECKING:
+    from nmigen.build import Platform
+
+# keep in sync with amigen/__init__.py, which lists the same names to re-export them lazily
 __all__ = [
     'GlobalKey',
     'Key',
@@ -23,7 +30,10 @@ __all__ = [
     'DomainMapper',
     'ClockSignal',
     'ResetSignal',
-    'element_to_module'
+    'element_to_module',
+    'element_to_module_async',
+    'elaboration_stats',
+    'write_elaboration_stats'
 ]
 
 def ClockSignal(name = "sync"):
@@ -62,9 +72,6 @@ class GlobalKey(Key):
         self.value = GlobalKey.__counter
         GlobalKey.__counter += 1
 
-# Bad hack :(
-del Module.__init_subclass__
-
 class SubmoduleBuilder:
     def __init__(self):
         object.__setattr__(self, "_storage", {})
@@ -140,11 +147,20 @@ class DomainSetBuilder:
                             .format(domain.name, name))
         self += domain
 
-class ModuleWrapper(Module):
-    def __init__(self, element, top):
-        super().__init__()
-        self.submodules = SubmoduleBuilder()
-        self.domains = DomainSetBuilder(element, top)
+# Bad hack :(
+# nmigen forbids subclassing Module, so lift the check while defining ModuleWrapper and restore it afterwards,
+# such that importing amigen does not change the behaviour of nmigen for everyone else
+_module_init_subclass = Module.__dict__["__init_subclass__"]
+del Module.__init_subclass__
+try:
+    class ModuleWrapper(Module):
+        def __init__(self, element, top):
+            super().__init__()
+            self.element = element
+            self.submodules = SubmoduleBuilder()
+            self.domains = DomainSetBuilder(element, top)
+finally:
+    Module.__init_subclass__ = _module_init_subclass
 
 class ElementMeta(type):
     def __call__(cls, *args, key = None, name = None, **kwargs):
@@ -295,8 +311,20 @@ class GlobalElaborationContext:
         finally:
             GlobalElaborationContext.current_context = old_context
 
-def element_to_module(element: Element, platform = None, top_name = "top", for_nmigen = False) -> Module:
-    def element_to_module_inner(element: Element, top = False, domains = {}, parent: ElaborationContext = None) -> Module:
+    # swap in the given (current_context, current_element) state and return the previous one
+    @staticmethod
+    def _swap_state(state: tuple[ElaborationContext | None, Element | None]) -> tuple[ElaborationContext | None, Element | None]:
+        old_state = (GlobalElaborationContext.current_context, GlobalElaborationContext.current_element)
+        GlobalElaborationContext.current_context, GlobalElaborationContext.current_element = state
+        return old_state
+
+# The elaboration of a Element tree as a generator, shared by `element_to_module` and `element_to_module_async`.
+# Yields each element as soon as it is done (after its finalize phase and the elaboration of all its submodules), returns the module of the top element.
+def _element_to_module_steps(element: Element, platform, top_name, for_nmigen):
+    # elaborates a single element. To elaborate a submodule, the generator for the submodule is yielded and the resulting module is sent back.
+    # The generators are driven from a explicit stack below instead of nesting them with `yield from`,
+    # so each step costs the same independent of the depth of the Element tree (and deep trees do not hit the recursion limit)
+    def element_to_module_inner(element: Element, top = False, domains = {}, parent: ElaborationContext = None):
         with GlobalElaborationContext.context_for(element = element, parent = parent, domains = domains, platform = platform) as context:
             module = ModuleWrapper(element, top and for_nmigen)
             element.m = module
@@ -330,7 +358,8 @@ def element_to_module(element: Element, platform = None, top_name = "top", for_n
                         else:
                             domains_for_submodule[domain_name] = domain
 
-                    module._add_submodule(element_to_module_inner(submodule, parent = context, domains = domains_for_submodule), name)
+                    submodule_module = yield element_to_module_inner(submodule, parent = context, domains = domains_for_submodule)
+                    module._add_submodule(submodule_module, name)
                 elif hasattr(submodule, "elaborate") or isinstance(submodule, Fragment):
                     done_submodules.add(submodule)
 
@@ -341,7 +370,7 @@ def element_to_module(element: Element, platform = None, top_name = "top", for_n
                     raise ValueError(f"don't know what to do with submodule {name} = {submodule}")
 
             for name, submodule in module.submodules:
-                add_submodule(name, submodule, context)
+                yield from add_submodule(name, submodule, context)
 
 
             element.finalize(context)
@@ -359,11 +388,215 @@ def element_to_module(element: Element, platform = None, top_name = "top", for_n
             for name, submodule in module.submodules:
                 # only add submodules we did not already add after create
                 if not hasattr(submodule, "m") and submodule not in done_submodules:
-                    add_submodule(name, submodule, context._copy_invisible())
+                    yield from add_submodule(name, submodule, context._copy_invisible())
 
             return module
 
     if element.name == None:
         element.name = top_name
 
-    return element_to_module_inner(element, top = True)
+    stack = [element_to_module_inner(element, top = True)]
+    try:
+        value = None
+        exception = None
+        while True:
+            try:
+                if exception is not None:
+                    submodule_steps = stack[-1].throw(exception)
+                else:
+                    submodule_steps = stack[-1].send(value)
+            except StopIteration as e:
+                stack.pop()
+                module = e.value
+                yield module.element
+
+                if not stack:
+                    return module
+
+                value, exception = module, None
+            except BaseException as e:
+                # propagate the error to the parent element, so its context gets exited as well
+                stack.pop()
+                if not stack:
+                    raise
+
+                value, exception = None, e
+            else:
+                stack.append(submodule_steps)
+                value, exception = None, None
+    finally:
+        # only non empty if we are closed early (cancellation), unwind innermost first
+        while stack:
+            stack.pop().close()
+
+def element_to_module(element: Element, platform = None, top_name = "top", for_nmigen = False) -> Module:
+    steps = _element_to_module_steps(element, platform, top_name, for_nmigen)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as e:
+            return e.value
+
+# Like `element_to_module`, but yields to the event loop between elements, so elaborating a large design does not block other tasks.
+# Once a element is done and at least `yield_interval` seconds (default 10ms) passed since we last yielded, we yield to the event loop.
+# With `yield_interval = 0` we yield after every element.
+# The elaboration order and the `GlobalElaborationContext` seen by the elements are the same as for `element_to_module`,
+# the state of `GlobalElaborationContext` is swapped out whenever we yield, so multiple elaborations can run concurrently on the same event loop.
+# `progress` is called with each element that is done and the number of elements done so far.
+# Cancelling the task stops the elaboration, the `GlobalElaborationContext` is restored to the state before the elaboration.
+async def element_to_module_async(element: Element, platform = None, top_name = "top", for_nmigen = False, progress = None, yield_interval = 0.01) -> Module:
+    import asyncio
+    import time
+
+    steps = _element_to_module_steps(element, platform, top_name, for_nmigen)
+    state = (GlobalElaborationContext.current_context, GlobalElaborationContext.current_element)
+    done = 0
+    last_yield = time.perf_counter()
+
+    try:
+        while True:
+            outer_state = GlobalElaborationContext._swap_state(state)
+            try:
+                finished_element = next(steps)
+            except StopIteration as e:
+                return e.value
+            finally:
+                state = GlobalElaborationContext._swap_state(outer_state)
+
+            done += 1
+            if progress is not None:
+                progress(finished_element, done)
+
+            if time.perf_counter() - last_yield >= yield_interval:
+                await asyncio.sleep(0)
+                last_yield = time.perf_counter()
+    finally:
+        # unwind a unfinished elaboration (cancellation, exception in `progress`) inside its own state, so the contexts it entered get exited
+        outer_state = GlobalElaborationContext._swap_state(state)
+        try:
+            steps.close()
+        finally:
+            GlobalElaborationContext._swap_state(outer_state)
+
+# approximate the memory retained by `roots`, walking containers and the nmigen AST (Values, Statements, ClockDomains)
+# objects already in `seen` are not counted again, so shared objects (signals used in multiple modules) are attributed to the first module reaching them
+def _approximate_size(roots, seen: set) -> int:
+    size = 0
+    stack = list(roots)
+
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, (str, bytes, int, float)):
+            continue
+        elif isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, (Value, Statement, ClockDomain, Mapping)) and hasattr(obj, "__dict__"):
+            size += sys.getsizeof(obj.__dict__)
+            stack.extend(obj.__dict__.values())
+
+    return size
+
+# the module attributes holding the statements, drivers and domains of a single module, everything else either points to the builders or to submodules
+_MODULE_STATE_ATTRIBUTES = ("_statements", "_ctrl_stack", "_driving", "_domains", "_generated")
+
+# Collect statistics about the result of `element_to_module`.
+# Returns a dict mapping the path of each element in the Element tree (`top/A#0/B#0`) to a dict with
+# - elements: number of elements in the subtree rooted at this element, including the element itself
+# - statements: number of statements per clock domain (by the actual clock domain name, `comb` for combinational statements).
+#   A statement driving multiple domains (for example a `If` with `comb` and `sync` bodies) is counted once for each domain
+# - driven_signals: number of signals driven by this element
+# - domains: number of clock domains created by this element using `m.domains += ...`
+# - nmigen_submodules: number of nmigen submodules (Elaboratables, Fragments) added by this element
+# - memory: approximate memory in bytes retained by this element
+# - subtree_memory: approximate memory in bytes retained by the subtree rooted at this element
+# The Element tree is walked iteratively, so the runtime is linear in the size of the design and deep trees do not hit the recursion limit.
+# The walk allocates a lot of small objects, on very large designs the cyclic gc can take a noticeable share of the runtime; callers that care can disable it around the call.
+def elaboration_stats(module: Module) -> dict[str, dict]:
+    if not isinstance(module, ModuleWrapper):
+        raise TypeError(f"expected the result of element_to_module, not {module!r}")
+
+    stats = {}
+    # (path, index of the parent in order), in pre-order
+    order = []
+    seen = set()
+
+    stack = [(module, module.element.name, None)]
+    while stack:
+        module, path, parent = stack.pop()
+
+        if path in stats:
+            raise ValueError(f"duplicate element path {path}")
+
+        # pending control flow (`If`, `Switch`, `FSM`) only gets turned into statements when flushed
+        module._flush()
+
+        statements = defaultdict(int)
+        for stmt in module._statements:
+            for domain in { module._driving[sig] for sig in stmt._lhs_signals() }:
+                statements["comb" if domain is None else domain] += 1
+
+        nmigen_submodules = 0
+        children = []
+        for submodule in [*module._named_submodules.values(), *module._anon_submodules]:
+            if isinstance(submodule, ModuleWrapper):
+                children.append((submodule, path + "/" + submodule.element.name, len(order)))
+            else:
+                nmigen_submodules += 1
+
+        memory = sys.getsizeof(module) + sys.getsizeof(module.__dict__)
+        memory += sys.getsizeof(module._named_submodules) + sys.getsizeof(module._anon_submodules)
+        memory += sys.getsizeof(module.element) + sys.getsizeof(getattr(module.element, "__dict__", {}))
+        memory += _approximate_size([getattr(module, attr) for attr in _MODULE_STATE_ATTRIBUTES], seen)
+
+        stats[path] = {
+            "elements": 1,
+            "statements": dict(statements),
+            "driven_signals": len(module._driving),
+            "domains": len(module._domains),
+            "nmigen_submodules": nmigen_submodules,
+            "memory": memory,
+            "subtree_memory": memory,
+        }
+        order.append((path, parent))
+
+        # reversed, so the submodules are visited in the order they were added
+        stack.extend(reversed(children))
+
+    # accumulate the subtree totals, children always come after their parent in pre-order
+    for path, parent in reversed(order):
+        if parent is not None:
+            parent_stats = stats[order[parent][0]]
+            parent_stats["elements"] += stats[path]["elements"]
+            parent_stats["subtree_memory"] += stats[path]["subtree_memory"]
+
+    return stats
+
+# Write the result of `elaboration_stats` to `file`, either as json (`format = "json"`) or as csv (`format = "csv"`).
+# In the csv output the statement counts are flattened into one `statements:<domain>` column per clock domain.
+def write_elaboration_stats(stats: dict[str, dict], file: TextIO, format = "json"):
+    import json
+    import csv
+
+    if format == "json":
+        json.dump(stats, file, indent = 2)
+    elif format == "csv":
+        domains = sorted({ domain for entry in stats.values() for domain in entry["statements"] })
+        fields = ["path", "elements", *(f"statements:{domain}" for domain in domains), "driven_signals", "domains", "nmigen_submodules", "memory", "subtree_memory"]
+
+        writer = csv.DictWriter(file, fields, restval = 0)
+        writer.writeheader()
+        for path, entry in stats.items():
+            row = { key: value for key, value in entry.items() if key != "statements" }
+            row.update({ f"statements:{domain}": count for domain, count in entry["statements"].items() })
+            writer.writerow({ "path": path, **row })
+    else:
+        raise ValueError(f"unknown stats format {format}")
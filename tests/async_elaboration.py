@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+from amigen import *
+from nmigen import Fragment
+import asyncio
+import pytest
+import sys
+
+class Leaf(Element):
+    def create(self, context):
+        a = Signal()
+        self.m.d.sync += a.eq(~a)
+        context.find(Tree).order.append(("create", "/".join(reversed(list(context.path())))))
+
+    def finalize(self, context):
+        assert GlobalElaborationContext.current_context is context
+        context.find(Tree).order.append(("finalize", "/".join(reversed(list(context.path())))))
+
+class Tree(Element):
+    def __init__(self, depth):
+        self.depth = depth
+        self.order = []
+
+    def create(self, context):
+        self.m.submodules += Node(self.depth)
+
+class Node(Element):
+    def __init__(self, depth):
+        self.depth = depth
+
+    def create(self, context):
+        if self.depth > 0:
+            self.m.submodules += Node(self.depth - 1)
+        self.m.submodules += Leaf()
+
+    def finalize(self, context):
+        self.m.submodules += Leaf()
+
+def test_async_elaboration_matches_sync():
+    sync_top = Tree(3)
+    sync_frag = Fragment.get(element_to_module(sync_top), None)
+
+    done = []
+    async_top = Tree(3)
+    module = asyncio.run(element_to_module_async(async_top, progress = lambda element, count: done.append((element, count))))
+    async_frag = Fragment.get(module, None)
+
+    assert async_top.order == sync_top.order
+    assert len(async_frag.subfragments) == len(sync_frag.subfragments)
+    assert GlobalElaborationContext.current_context is None
+
+    # every element reports once, the top element last
+    assert [count for _, count in done] == list(range(1, len(done) + 1))
+    assert len(done) == 1 + 4 + 2 * 4
+    assert done[-1][0] is async_top
+
+def test_async_elaboration_concurrent():
+    async def run():
+        return await asyncio.gather(element_to_module_async(Tree(4), yield_interval = 0), element_to_module_async(Tree(2), yield_interval = 0))
+
+    first, second = asyncio.run(run())
+    assert first.element.order == element_to_module(Tree(4)).element.order
+    assert second.element.order == element_to_module(Tree(2)).element.order
+
+def test_async_elaboration_cancel():
+    async def run():
+        done = []
+        started = asyncio.Event()
+
+        def progress(element, count):
+            done.append(element)
+            started.set()
+
+        task = asyncio.create_task(element_to_module_async(Tree(5), progress = progress, yield_interval = 0))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return done
+
+    done = asyncio.run(run())
+    assert 0 < len(done) < 1 + 6 + 2 * 6
+    assert GlobalElaborationContext.current_context is None
+
+class Chain(Element):
+    def __init__(self, depth):
+        self.depth = depth
+
+    def create(self, context):
+        if self.depth > 0:
+            self.m.submodules += Chain(self.depth - 1)
+
+        # the number of python frames below us, to check that elaboration does not nest
+        frame = sys._getframe()
+        self.frames = 0
+        while (frame := frame.f_back) is not None:
+            self.frames += 1
+
+class Failing(Element):
+    def create(self, context):
+        raise RuntimeError("failing element")
+
+def test_deep_tree():
+    # elaboration does not recurse, so trees deeper than the recursion limit work
+    depth = 2 * sys.getrecursionlimit()
+    module = element_to_module(Chain(depth))
+    for _ in range(depth):
+        module = module._named_submodules["Chain#0"]
+    assert module.element.depth == 0
+
+    # the elements are elaborated with the same number of frames below them independent of their depth,
+    # so no step has to pass through the frames of all ancestors
+    top = Chain(10)
+    element_to_module(top)
+    assert top.frames == module.element.frames
+    assert top.m._named_submodules["Chain#0"].element.frames == module.element.frames
+
+def test_elaboration_error_exits_contexts():
+    class Top(Element):
+        def create(self, context):
+            self.m.submodules += Chain(3)
+
+        def finalize(self, context):
+            self.m.submodules += Chain(2)
+            self.m.submodules += Failing()
+
+    with pytest.raises(RuntimeError, match = "failing element"):
+        element_to_module(Top())
+    assert GlobalElaborationContext.current_context is None
+
+    with pytest.raises(RuntimeError, match = "failing element"):
+        asyncio.run(element_to_module_async(Top(), yield_interval = 0))
+    assert GlobalElaborationContext.current_context is None
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import amigen
+import subprocess
+import sys
+import os
+import re
+import pytest
+from amigen.__main__ import main
+from nmigen import Module
+from nmigen.hdl.dsl import SyntaxError as ModuleSyntaxError
+
+def test_command_line(tmp_path, monkeypatch, capsys):
+    (tmp_path / "cli_design.py").write_text(
+        "from amigen import *\n"
+        "class ThePlatform:\n"
+        "    pass\n"
+        "class Top(Element):\n"
+        "    def create(self, context):\n"
+        "        assert isinstance(context.platform, ThePlatform)\n"
+        "        self.i = Signal(name = 'i')\n"
+        "        self.o = Signal(name = 'o')\n"
+        "        a = Signal()\n"
+        "        self.m.d.sync += a.eq(~a)\n"
+        "        self.m.d.comb += self.o.eq(a & self.i)\n"
+        "    def ports(self):\n"
+        "        return [self.i, self.o]\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    output = tmp_path / "top.il"
+    stats = tmp_path / "stats.json"
+    assert main(["cli_design:Top", "-o", str(output), "-n", "the_top", "-p", "cli_design:ThePlatform", "--stats", str(stats)]) == 0
+
+    rtlil = output.read_text()
+    assert 'attribute \\nmigen.hierarchy "the_top"' in rtlil
+    # the ports from `ports()` and the clock domain exposed as the regular nmigen `sync` domain
+    for direction, port in [("input", "i"), ("output", "o"), ("input", "clk"), ("input", "rst")]:
+        assert re.search(rf"wire width 1 {direction} \d+ \\{port}\n", rtlil)
+    assert '"the_top"' in stats.read_text()
+
+    timings = capsys.readouterr().err
+    for phase in ["import", "construct", "elaborate", "stats", "convert", "write", "total"]:
+        assert any(line.startswith(phase + " ") for line in timings.splitlines())
+
+    with pytest.raises(SystemExit):
+        main(["cli_design:Top", "-o", str(tmp_path / "top.unknown"), "-p", "cli_design:ThePlatform"])
+
+def test_lazy_import():
+    package_dir = os.path.dirname(os.path.dirname(amigen.__file__))
+    subprocess.run([sys.executable, "-c", "import amigen, sys; assert 'nmigen' not in sys.modules"], check = True, cwd = package_dir)
+
+    assert amigen.__all__ == amigen.core.__all__
+
+def test_module_subclass_check_restored():
+    with pytest.raises(ModuleSyntaxError):
+        class NotAllowed(Module):
+            pass
+
+def test_command_line_reports_on_failure(tmp_path, monkeypatch, capsys):
+    (tmp_path / "cli_broken_design.py").write_text("not_an_element = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    with pytest.raises(TypeError):
+        main(["cli_broken_design:not_an_element", "-o", str(tmp_path / "top.il")])
+
+    timings = capsys.readouterr().err
+    for phase in ["import", "construct", "total"]:
+        assert any(line.startswith(phase + " ") for line in timings.splitlines())
+    assert not any(line.startswith("elaborate ") for line in timings.splitlines())
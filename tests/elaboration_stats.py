@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+from amigen import *
+from nmigen import Memory
+import io
+import csv
+import json
+
+def test_elaboration_stats():
+    class A(Element):
+        def create(self, context):
+            self.m.domains += ClockDomain("sync")
+            self.m.domains += ClockDomain("a")
+
+            a = Signal()
+            b = Signal()
+            c = Signal()
+            e = Signal()
+            self.m.d.a += a.eq(b)
+            self.m.d.comb += c.eq(b)
+
+            with self.m.If(b):
+                self.m.d.a += b.eq(0)
+                self.m.d.comb += e.eq(1)
+
+            self.m.submodules += DomainMapper("a")(B())
+            self.m.submodules += B()
+
+    class B(Element):
+        def create(self, context):
+            d = Signal()
+            self.m.d.sync += d.eq(~d)
+
+            memory = Memory(width=8, depth=4)
+            self.m.submodules.read_port = memory.read_port()
+
+    top = A()
+    stats = elaboration_stats(element_to_module(top))
+
+    assert list(stats.keys()) == ["top", "top/B#0", "top/B#1"]
+
+    assert stats["top"]["elements"] == 3
+    assert stats["top"]["statements"] == {"_internal_top_a": 2, "comb": 2}
+    assert stats["top"]["driven_signals"] == 4
+    assert stats["top"]["domains"] == 2
+    assert stats["top"]["nmigen_submodules"] == 0
+
+    assert stats["top/B#0"]["elements"] == 1
+    assert stats["top/B#0"]["statements"] == {"_internal_top_a": 1}
+    assert stats["top/B#0"]["domains"] == 0
+    assert stats["top/B#0"]["nmigen_submodules"] == 1
+    assert stats["top/B#1"]["statements"] == {"_internal_top_sync": 1}
+
+    for entry in stats.values():
+        assert entry["memory"] > 0
+    assert stats["top"]["subtree_memory"] == sum(entry["memory"] for entry in stats.values())
+
+    out = io.StringIO()
+    write_elaboration_stats(stats, out, format = "json")
+    assert json.loads(out.getvalue()) == stats
+
+    out = io.StringIO()
+    write_elaboration_stats(stats, out, format = "csv")
+    rows = { row["path"]: row for row in csv.DictReader(io.StringIO(out.getvalue())) }
+    assert rows["top"]["statements:comb"] == "2"
+    assert rows["top/B#0"]["statements:comb"] == "0"
+    assert rows["top/B#1"]["statements:_internal_top_sync"] == "1"
+    assert rows["top"]["elements"] == "3"